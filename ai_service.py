@@ -2,11 +2,27 @@ import os
 import json
 import logging
 import google.generativeai as genai
+from segmentation import (
+    resegment_transcript, segmentation_stats,
+    DEFAULT_MAX_DURATION, DEFAULT_MAX_CHARS
+)
+from summarizer import extractive_summary
 
 logger = logging.getLogger(__name__)
 
+# Analysis types that can be requested together in one model call
+ANALYSIS_TYPES = ('summary', 'key_points', 'speakers')
+
+# Prefix of the text results returned when a Gemini call fails
+AI_ERROR_PREFIX = "Error: The AI service failed to process the request."
+
 class AIService:
-    def __init__(self):
+    def __init__(self, model=None):
+        if model is not None:
+            # Any object with a Gemini-compatible generate_content()
+            self.model = model
+            return
+
         # Configure the Gemini API client
         api_key = os.environ.get("GEMINI_API_KEY")
         if not api_key:
@@ -40,10 +56,22 @@ class AIService:
             # or raise a more specific exception.
             if is_json_output:
                 return {"error": "API call failed", "details": str(e)}
-            return f"Error: The AI service failed to process the request. Details: {e}"
+            return f"{AI_ERROR_PREFIX} Details: {e}"
+
+    def identify_speakers(self, transcript_segments, resegment=False,
+                          max_duration=DEFAULT_MAX_DURATION, max_chars=DEFAULT_MAX_CHARS):
+        """Speaker identification using Gemini.
+
+        With resegment=True the caption fragments are merged into
+        sentence-level cues (limited by max_duration and max_chars) before
+        prompting, and each cue's speaker is copied back onto the fragments
+        it was built from.
+        """
+        if resegment:
+            cues = resegment_transcript(transcript_segments, max_duration=max_duration, max_chars=max_chars)
+            logger.debug(f"Re-segmented speaker prompt: {segmentation_stats(transcript_segments, cues)}")
+            return self._copy_cue_speakers(transcript_segments, self.identify_speakers(cues))
 
-    def identify_speakers(self, transcript_segments):
-        """Speaker identification using Gemini."""
         transcript_text = "\n".join([
             f"[{segment['start']:.2f}s]: {segment['text']}"
             for segment in transcript_segments
@@ -60,28 +88,128 @@ class AIService:
         result = self._call_gemini_api(prompt, is_json_output=True)
         
         if "error" in result:
-             # Fallback: if API fails, just return original segments with default speaker IDs
-            return [
-                {**seg, 'speaker_id': f'Speaker {(i % 2) + 1}'} 
-                for i, seg in enumerate(transcript_segments)
-            ]
-
-        # Combine AI result with original data
-        ai_segments = result.get('segments', [])
+            return self._default_speakers(transcript_segments)
+
+        return self._merge_speakers(transcript_segments, result.get('segments', []))
+
+    @staticmethod
+    def _default_speakers(transcript_segments):
+        """Fallback: if API fails, just return original segments with default speaker IDs."""
+        return [
+            {**seg, 'speaker_id': f'Speaker {(i % 2) + 1}'} 
+            for i, seg in enumerate(transcript_segments)
+        ]
+
+    @staticmethod
+    def _merge_speakers(transcript_segments, ai_segments):
+        """Combine AI result with original data."""
         for i, original_segment in enumerate(transcript_segments):
-            if i < len(ai_segments):
+            if i < len(ai_segments) and isinstance(ai_segments[i], dict):
                 original_segment['speaker_id'] = ai_segments[i].get('speaker_id', f'Speaker {(i % 2) + 1}')
             else:
                 original_segment['speaker_id'] = f'Speaker {(i % 2) + 1}'
                 
         return transcript_segments
 
+    @staticmethod
+    def _copy_cue_speakers(transcript_segments, identified_cues):
+        """Copy each re-segmented cue's speaker onto its source fragments."""
+        for cue in identified_cues:
+            first, last = cue['source_range']
+            for segment in transcript_segments[first:last]:
+                segment['speaker_id'] = cue['speaker_id']
+        return transcript_segments
+
     def summarize_transcript(self, transcript_text):
         """Generate a concise summary of the transcript using Gemini."""
         prompt = f"Please provide a concise summary of this video transcript:\n\n{transcript_text}"
-        return self._call_gemini_api(prompt)
+        result = self._call_gemini_api(prompt)
+        if result.startswith(AI_ERROR_PREFIX):
+            return self._fallback_summary(transcript_text)
+        return result
+
+    @staticmethod
+    def _fallback_summary(transcript_text):
+        """Serve a local extractive summary when Gemini fails."""
+        logger.warning("Gemini summary failed, falling back to extractive summary")
+        return extractive_summary(transcript_text)
 
     def extract_key_points(self, transcript_text):
         """Extract key points and insights from the transcript using Gemini."""
         prompt = f"Extract the main points and insights from this video transcript. Format as a bulleted list:\n\n{transcript_text}"
         return self._call_gemini_api(prompt)
+
+    def analyze_transcript(self, transcript_segments, analysis_types, resegment=False,
+                           max_duration=DEFAULT_MAX_DURATION, max_chars=DEFAULT_MAX_CHARS):
+        """Run several analyses over one transcript in a single Gemini call.
+
+        The transcript is sent once and the model answers with one JSON
+        object, which is fanned back out to the shapes returned by
+        summarize_transcript ('summary'), extract_key_points ('key_points')
+        and identify_speakers ('segments').
+        """
+        analysis_types = [t for t in ANALYSIS_TYPES if t in analysis_types]
+        if not analysis_types:
+            raise ValueError("No valid analysis types requested.")
+
+        if resegment:
+            cues = resegment_transcript(transcript_segments, max_duration=max_duration, max_chars=max_chars)
+            logger.debug(f"Re-segmented analysis prompt: {segmentation_stats(transcript_segments, cues)}")
+            results = self.analyze_transcript(cues, analysis_types)
+            if 'segments' in results:
+                results['segments'] = self._copy_cue_speakers(transcript_segments, results['segments'])
+            return results
+
+        instructions = []
+        if 'summary' in analysis_types:
+            instructions.append('- "summary": a concise summary of the video transcript, as a string.')
+        if 'key_points' in analysis_types:
+            instructions.append('- "key_points": the main points and insights, as a string formatted as a bulleted list with one point per line.')
+        if 'speakers' in analysis_types:
+            instructions.append("- \"segments\": an array with one object per transcript line, in order. Each object should contain the original 'start' and 'text', plus a 'speaker_id' (e.g., 'Speaker 1', 'Speaker 2').")
+            # Speaker identification needs the per-segment timestamps
+            transcript_text = "\n".join([
+                f"[{segment['start']:.2f}s]: {segment['text']}"
+                for segment in transcript_segments
+            ])
+        else:
+            transcript_text = ' '.join(segment['text'] for segment in transcript_segments)
+
+        instruction_text = "\n        ".join(instructions)
+        prompt = f"""You are an expert transcript analyzer.
+        Analyze the following video transcript and return a single JSON object with exactly these keys:
+        {instruction_text}
+        
+        Transcript:
+        {transcript_text}"""
+
+        result = self._call_gemini_api(prompt, is_json_output=True)
+        failed = not isinstance(result, dict) or "error" in result
+        details = 'Unexpected response format'
+        if failed and isinstance(result, dict):
+            details = result.get('details', details)
+        error_text = f"{AI_ERROR_PREFIX} Details: {details}"
+
+        # A value of the wrong type is handled like a failed call for that key
+        results = {}
+        if 'summary' in analysis_types:
+            summary = None if failed else result.get('summary')
+            if not isinstance(summary, str):
+                summary = self._fallback_summary(
+                    ' '.join(segment['text'] for segment in transcript_segments)
+                )
+            results['summary'] = summary
+        if 'key_points' in analysis_types:
+            key_points = error_text if failed else result.get('key_points')
+            if isinstance(key_points, list):
+                key_points = "\n".join(f"- {point}" for point in key_points)
+            elif not isinstance(key_points, str):
+                key_points = error_text
+            results['key_points'] = key_points
+        if 'speakers' in analysis_types:
+            segments = None if failed else result.get('segments')
+            if isinstance(segments, list):
+                results['segments'] = self._merge_speakers(transcript_segments, segments)
+            else:
+                results['segments'] = self._default_speakers(transcript_segments)
+        return results
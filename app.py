@@ -1,17 +1,31 @@
 import os
 import re
-import json
 import nltk
 from urllib.parse import urlparse, parse_qs
-from flask import Flask, render_template, request, jsonify, send_file, session, make_response
+from flask import Flask, Request, render_template, request, jsonify, send_file, session, make_response
+from werkzeug.exceptions import RequestEntityTooLarge
 import youtube_transcript_api
 from youtube_transcript_api._errors import TranscriptsDisabled, NoTranscriptFound
 import logging
 import io
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
 from wordcloud import WordCloud
 from nltk.corpus import stopwords
 from nltk.tokenize import word_tokenize
-from ai_service import AIService
+from ai_service import AIService, ANALYSIS_TYPES
+from chapters import detect_chapters
+from summarizer import extractive_summary, DEFAULT_NUM_SENTENCES
+from http_cache import EtagStore, content_etag
+from transcript_stream import (
+    load_transcript, TranscriptFormatError, TranscriptLimitError,
+    DEFAULT_MAX_SEGMENTS, DEFAULT_MAX_TEXT_CHARS, DEFAULT_MAX_TOTAL_CHARS
+)
+from segmentation import (
+    resegment_transcript, segmentation_stats,
+    DEFAULT_MAX_DURATION, DEFAULT_MAX_CHARS
+)
 
 # Download NLTK data to /tmp
 
@@ -27,11 +41,43 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+class TranscriptRequest(Request):
+    # Flask only reads the MAX_FORM_MEMORY_SIZE config key from 3.1 on, so
+    # the limit is set on the request class to apply with any version
+    max_form_memory_size = int(os.environ.get('MAX_FORM_MEMORY_SIZE', 2 * 1024 * 1024))
+
 app = Flask(__name__)
+app.request_class = TranscriptRequest
 app.secret_key = os.environ.get("SESSION_SECRET")
 
+# Request size limits. Werkzeug rejects bodies over MAX_CONTENT_LENGTH and
+# multipart form fields over TranscriptRequest.max_form_memory_size, which
+# reject_oversized_requests also applies to whole URL-encoded bodies; the
+# transcript limits are enforced while transcript_data is parsed.
+app.config['MAX_CONTENT_LENGTH'] = int(os.environ.get('MAX_CONTENT_LENGTH', 32 * 1024 * 1024))
+app.config['TRANSCRIPT_MAX_SEGMENTS'] = int(os.environ.get('TRANSCRIPT_MAX_SEGMENTS', DEFAULT_MAX_SEGMENTS))
+app.config['TRANSCRIPT_MAX_TEXT_CHARS'] = int(os.environ.get('TRANSCRIPT_MAX_TEXT_CHARS', DEFAULT_MAX_TEXT_CHARS))
+app.config['TRANSCRIPT_MAX_TOTAL_CHARS'] = int(os.environ.get('TRANSCRIPT_MAX_TOTAL_CHARS', DEFAULT_MAX_TOTAL_CHARS))
+
 ai_service = AIService()
 
+@app.before_request
+def reject_oversized_requests():
+    """Reject bodies over the configured size limits before any route runs."""
+    if request.method != 'POST':
+        return None
+    # Werkzeug applies max_form_memory_size to multipart fields only; a
+    # URL-encoded body is read into memory whole
+    if request.mimetype == 'application/x-www-form-urlencoded' and \
+            (request.content_length or 0) > request.max_form_memory_size:
+        return jsonify({'error': 'Request body is too large'}), 413
+    try:
+        # Parses the body once: file parts are spooled to disk, plain fields
+        # are held in memory up to MAX_FORM_MEMORY_SIZE
+        request.form
+    except RequestEntityTooLarge:
+        return jsonify({'error': 'Request body is too large'}), 413
+
 @app.route('/')
 def index():
     return render_template('index.html')
@@ -56,40 +102,10 @@ def get_languages():
 
         # Get all available languages
         languages = []
+        original_language = None
         try:
-            # First, identify the original language
-            original_language = None
-            try:
-                original_transcript = transcript_list.find_manually_created_transcript()
-                original_language = {
-                    'code': original_transcript.language_code,
-                    'name': original_transcript.language,
-                    'type': 'original'
-                }
-            except:
-                # If no manual transcript, try to get the auto-generated one
-                original_transcript = transcript_list.find_generated_transcript()
-                original_language = {
-                    'code': original_transcript.language_code,
-                    'name': original_transcript.language,
-                    'type': 'generated'
-                }
-
-            # Get manually created transcripts
-            for transcript in transcript_list._manually_created_transcripts.values():
-                languages.append({
-                    'code': transcript.language_code,
-                    'name': transcript.language,
-                    'type': 'manual'
-                })
-
-            # Get auto-generated transcripts
-            for transcript in transcript_list._generated_transcripts.values():
-                languages.append({
-                    'code': transcript.language_code,
-                    'name': transcript.language,
-                    'type': 'generated'
-                })
+            original_language = find_original_language(transcript_list)
+            languages = list_languages(transcript_list)
 
             # Store original language in session
             if original_language:
@@ -136,26 +152,8 @@ def get_transcript():
             return jsonify({'error': 'Invalid YouTube URL'}), 400
 
         logger.info(f"Fetching transcript for video ID: {video_id} in language: {language_code}")
-        transcript_list = youtube_transcript_api.YouTubeTranscriptApi.list_transcripts(video_id)
-
-        try:
-            # Try to get the transcript in the requested language
-            transcript = transcript_list.find_transcript([language_code])
-
-            # Check if we need to translate
-            original_language = session.get('original_language', {}).get('code')
-            if original_language and language_code != original_language:
-                logger.info(f"Translating transcript from {original_language} to {language_code}")
-                transcript = transcript_list.find_transcript([original_language]).translate(language_code)
-
-            transcript_data = transcript.fetch()
-
-        except Exception as e:
-            logger.error(f"Error fetching transcript in {language_code}: {str(e)}")
-            # Try to get any available transcript if specified language is not available
-            transcript = transcript_list.find_transcript([])
-            transcript_data = transcript.fetch()
-            logger.info(f"Falling back to available transcript in {transcript.language_code}")
+        original_language = session.get('original_language', {}).get('code')
+        transcript, transcript_data = fetch_transcript(video_id, language_code, original_language)
 
         if not transcript_data:
             logger.warning(f"No transcript found for video ID: {video_id}")
@@ -180,6 +178,147 @@ def get_transcript():
         logger.error(f"Error getting transcript: {str(e)}")
         return jsonify({'error': 'An error occurred while fetching the transcript'}), 500
 
+def find_original_language(transcript_list):
+    """Identify the original language of a video's transcripts."""
+    try:
+        original_transcript = transcript_list.find_manually_created_transcript()
+        return {
+            'code': original_transcript.language_code,
+            'name': original_transcript.language,
+            'type': 'original'
+        }
+    except:
+        # If no manual transcript, try to get the auto-generated one
+        original_transcript = transcript_list.find_generated_transcript()
+        return {
+            'code': original_transcript.language_code,
+            'name': original_transcript.language,
+            'type': 'generated'
+        }
+
+def list_languages(transcript_list):
+    """List the manual and auto-generated transcript languages of a video."""
+    languages = []
+
+    # Get manually created transcripts
+    for transcript in transcript_list._manually_created_transcripts.values():
+        languages.append({
+            'code': transcript.language_code,
+            'name': transcript.language,
+            'type': 'manual'
+        })
+
+    # Get auto-generated transcripts
+    for transcript in transcript_list._generated_transcripts.values():
+        languages.append({
+            'code': transcript.language_code,
+            'name': transcript.language,
+            'type': 'generated'
+        })
+
+    return languages
+
+def fetch_transcript(video_id, language_code, original_language=None):
+    """Fetch a transcript, translating from original_language if it differs.
+
+    Falls back to any available transcript if the requested language is not
+    available. Returns the transcript object and its fetched entries.
+    """
+    transcript_list = youtube_transcript_api.YouTubeTranscriptApi.list_transcripts(video_id)
+
+    try:
+        # Try to get the transcript in the requested language
+        transcript = transcript_list.find_transcript([language_code])
+
+        # Check if we need to translate
+        if original_language and language_code != original_language:
+            logger.info(f"Translating transcript from {original_language} to {language_code}")
+            transcript = transcript_list.find_transcript([original_language]).translate(language_code)
+
+        transcript_data = transcript.fetch()
+
+    except Exception as e:
+        logger.error(f"Error fetching transcript in {language_code}: {str(e)}")
+        # Try to get any available transcript if specified language is not available
+        transcript = transcript_list.find_transcript([])
+        transcript_data = transcript.fetch()
+        logger.info(f"Falling back to available transcript in {transcript.language_code}")
+
+    return transcript, transcript_data
+
+def read_transcript_data():
+    """Parse the request's transcript_data incrementally into segments.
+
+    transcript_data is read from a file part when the client uploads it as
+    one, so the body is spooled by Werkzeug and parsed a chunk at a time;
+    the plain form field (capped by MAX_FORM_MEMORY_SIZE) is still accepted.
+    Returns None if it is missing. Raises TranscriptFormatError or
+    TranscriptLimitError.
+    """
+    upload = request.files.get('transcript_data')
+    if upload is not None:
+        stream = upload.stream
+    else:
+        transcript_data = request.form.get('transcript_data', '')
+        if not transcript_data:
+            return None
+        stream = io.StringIO(transcript_data)
+
+    return load_transcript(
+        stream,
+        max_segments=app.config['TRANSCRIPT_MAX_SEGMENTS'],
+        max_text_chars=app.config['TRANSCRIPT_MAX_TEXT_CHARS'],
+        max_total_chars=app.config['TRANSCRIPT_MAX_TOTAL_CHARS']
+    )
+
+def read_transcript_text():
+    """Return transcript_data as raw text, from the file part or form field."""
+    upload = request.files.get('transcript_data')
+    if upload is None:
+        return request.form.get('transcript_data', '')
+    # read_transcript_data may already have consumed part of the stream
+    upload.stream.seek(0)
+    return upload.stream.read().decode('utf-8-sig', errors='replace')
+
+def resegment_requested():
+    """Check whether the client asked for caption re-segmentation."""
+    return request.form.get('resegment', '').lower() in ('1', 'true', 'yes', 'on')
+
+def resegment_options():
+    """Read max_duration/max_chars from the form; ValueError if invalid."""
+    max_duration = float(request.form.get('max_duration', DEFAULT_MAX_DURATION))
+    max_chars = int(request.form.get('max_chars', DEFAULT_MAX_CHARS))
+    if not (0 < max_duration < float('inf')) or max_chars <= 0:
+        raise ValueError("Re-segmentation limits must be positive numbers")
+    return max_duration, max_chars
+
+@app.before_request
+def validate_resegment_options():
+    """Reject malformed re-segmentation limits before any route runs."""
+    if request.method != 'POST' or not resegment_requested():
+        return None
+    try:
+        resegment_options()
+    except ValueError:
+        return jsonify({'error': 'max_duration and max_chars must be positive numbers'}), 400
+
+def resegment_arguments():
+    """Keyword arguments passing the requested re-segmentation to AIService."""
+    if not resegment_requested():
+        return {'resegment': False}
+    max_duration, max_chars = resegment_options()
+    return {'resegment': True, 'max_duration': max_duration, 'max_chars': max_chars}
+
+def maybe_resegment(transcript_entries):
+    """Merge caption fragments into sentence-level cues if requested."""
+    if not resegment_requested() or not isinstance(transcript_entries, list):
+        return transcript_entries
+
+    max_duration, max_chars = resegment_options()
+    cues = resegment_transcript(transcript_entries, max_duration=max_duration, max_chars=max_chars)
+    logger.info(f"Re-segmented transcript: {segmentation_stats(transcript_entries, cues)}")
+    return cues
+
 def extract_video_id(url):
     try:
         logger.debug(f"Extracting video ID from URL: {url}")
@@ -207,21 +346,20 @@ def extract_video_id(url):
 @app.route('/download-transcript', methods=['POST'])
 def download_transcript():
     try:
-        transcript_data = request.form.get('transcript_data', '')  # Get raw transcript data
         format_type = request.form.get('format', 'txt')  # Default to txt if not specified
 
-        if not transcript_data:
-            logger.warning("No transcript provided for download")
-            return jsonify({'error': 'No transcript to download'}), 400
-
         try:
-            # Parse the transcript data from JSON string
-            transcript_entries = json.loads(transcript_data)
-        except json.JSONDecodeError:
+            # Parse the transcript data from the JSON upload
+            transcript_entries = read_transcript_data()
+        except TranscriptFormatError:
             # If not JSON, treat as plain text
             transcript_entries = None
+        except TranscriptLimitError as e:
+            return jsonify({'error': str(e)}), 413
+
+        if transcript_entries:
+            transcript_entries = maybe_resegment(transcript_entries)
 
-        if transcript_entries and isinstance(transcript_entries, list):
             # Generate formatted content based on the requested format
             if format_type == 'srt':
                 content = generate_srt(transcript_entries)
@@ -234,9 +372,13 @@ def download_transcript():
                 filename = 'transcript.txt'
         else:
             # Fallback to plain text if transcript_data is not in the expected format
-            content = transcript_data
+            content = read_transcript_text()
             filename = 'transcript.txt'
 
+            if not content:
+                logger.warning("No transcript provided for download")
+                return jsonify({'error': 'No transcript to download'}), 400
+
         # Convert to bytes for sending
         bytes_io = io.BytesIO()
         bytes_io.write(content.encode('utf-8'))
@@ -355,71 +497,83 @@ def get_word_at_position():
         logger.error(f"Error getting word at position: {str(e)}")
         return jsonify({'error': 'Failed to get word at position'}), 500
 
+def render_wordcloud(transcript_entries):
+    """Render a word cloud PNG and the clickable position of each word.
+
+    Raises ValueError if the transcript has no usable words.
+    """
+    # Combine all text from transcript
+    full_text = ' '.join(entry['text'] for entry in transcript_entries)
+
+    # Basic text cleaning
+    full_text = re.sub(r'[^\w\s]', '', full_text)
+    full_text = ' '.join(full_text.split())
+
+    # Filter out stop words
+    stop_words = set(stopwords.words('english'))
+    words = [word.lower() for word in full_text.split() 
+            if word.lower() not in stop_words and word.isalpha()]
+
+    if not words:
+        raise ValueError('No valid words found for word cloud')
+
+    # Generate word cloud with position tracking
+    wordcloud = WordCloud(
+        width=800,
+        height=400,
+        background_color='#2d2d2d',
+        colormap='viridis',
+        max_words=100,
+        min_font_size=10,
+        max_font_size=60,
+        # Fixed layout, so the same transcript always gets the same ETag
+        random_state=0
+    )
+
+    # Generate the word cloud
+    wordcloud.generate(' '.join(words))
+
+    # Get word positions with improved accuracy
+    word_positions = {}
+    for (word, freq), font_size, position, orientation, color in wordcloud.layout_:
+        x, y = position
+        width = len(word) * (font_size / 2)  # More accurate width calculation
+        height = font_size * 1.2  # Add some padding
+        word_positions[word] = {
+            'x': int(x),
+            'y': int(y - height/2),  # Center the clickable area
+            'width': int(width),
+            'height': int(height)
+        }
+        logger.debug(f"Word '{word}' position: x={x}, y={y}, width={width}, height={height}")
+
+    # Convert to image
+    img_io = io.BytesIO()
+    wordcloud.to_image().save(img_io, 'PNG')
+    return img_io.getvalue(), word_positions
+
 def generate_wordcloud():
     try:
-        transcript_data = request.form.get('transcript_data', '')
-        if not transcript_data:
-            return jsonify({'error': 'No transcript data provided'}), 400
-
-        # Parse transcript data
         try:
-            transcript_entries = json.loads(transcript_data)
-        except json.JSONDecodeError:
+            transcript_entries = read_transcript_data()
+        except TranscriptFormatError:
             return jsonify({'error': 'Invalid transcript data format'}), 400
+        except TranscriptLimitError as e:
+            return jsonify({'error': str(e)}), 413
 
-        # Combine all text from transcript
-        full_text = ' '.join(entry['text'] for entry in transcript_entries)
-
-        # Basic text cleaning
-        full_text = re.sub(r'[^\w\s]', '', full_text)
-        full_text = ' '.join(full_text.split())
-
-        # Filter out stop words
-        stop_words = set(stopwords.words('english'))
-        words = [word.lower() for word in full_text.split() 
-                if word.lower() not in stop_words and word.isalpha()]
-
-        if not words:
-            return jsonify({'error': 'No valid words found for word cloud'}), 400
-
-        # Generate word cloud with position tracking
-        wordcloud = WordCloud(
-            width=800,
-            height=400,
-            background_color='#2d2d2d',
-            colormap='viridis',
-            max_words=100,
-            min_font_size=10,
-            max_font_size=60
-        )
+        if transcript_entries is None:
+            return jsonify({'error': 'No transcript data provided'}), 400
 
-        # Generate the word cloud
-        wordcloud.generate(' '.join(words))
-
-        # Get word positions with improved accuracy
-        word_positions = {}
-        for (word, freq), font_size, position, orientation, color in wordcloud.layout_:
-            x, y = position
-            width = len(word) * (font_size / 2)  # More accurate width calculation
-            height = font_size * 1.2  # Add some padding
-            word_positions[word] = {
-                'x': int(x),
-                'y': int(y - height/2),  # Center the clickable area
-                'width': int(width),
-                'height': int(height)
-            }
-            logger.debug(f"Word '{word}' position: x={x}, y={y}, width={width}, height={height}")
+        try:
+            png_bytes, word_positions = render_wordcloud(transcript_entries)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
 
         # Store positions in session for click handling
         session['word_positions'] = word_positions
 
-        # Convert to image
-        img_io = io.BytesIO()
-        wordcloud.to_image().save(img_io, 'PNG')
-        img_io.seek(0)
-
         return send_file(
-            img_io,
+            io.BytesIO(png_bytes),
             mimetype='image/png',
             as_attachment=False
         )
@@ -436,16 +590,20 @@ def generate_wordcloud_route():
 @app.route('/analyze-transcript', methods=['POST'])
 def analyze_transcript():
     try:
-        transcript_data = request.form.get('transcript_data', '')
         analysis_type = request.form.get('type', '')  # 'summary' or 'key_points'
 
-        if not transcript_data:
-            return jsonify({'error': 'No transcript data provided'}), 400
-
         try:
-            transcript_entries = json.loads(transcript_data)
-        except json.JSONDecodeError:
+            transcript_entries = read_transcript_data()
+        except TranscriptFormatError:
             return jsonify({'error': 'Invalid transcript data format'}), 400
+        except TranscriptLimitError as e:
+            return jsonify({'error': str(e)}), 413
+
+        if transcript_entries is None:
+            return jsonify({'error': 'No transcript data provided'}), 400
+
+        # Drop rolling duplicate caption text before building the prompt
+        transcript_entries = maybe_resegment(transcript_entries)
 
         # Combine all text from transcript
         full_text = ' '.join(entry['text'] for entry in transcript_entries)
@@ -467,22 +625,56 @@ def analyze_transcript():
         logger.error(f"Error in analyze_transcript: {e}")
         return jsonify({'error': 'Failed to process request'}), 500
 
-@app.route('/identify-speakers', methods=['POST'])
-def identify_speakers():
+@app.route('/summary-preview', methods=['POST'])
+def summary_preview():
     try:
-        transcript_data = request.form.get('transcript_data', '')
+        try:
+            num_sentences = max(1, int(request.form.get('sentences', DEFAULT_NUM_SENTENCES)))
+        except ValueError:
+            return jsonify({'error': 'sentences must be an integer'}), 400
 
-        if not transcript_data:
+        try:
+            transcript_entries = read_transcript_data()
+        except TranscriptFormatError:
+            return jsonify({'error': 'Invalid transcript data format'}), 400
+        except TranscriptLimitError as e:
+            return jsonify({'error': str(e)}), 413
+
+        if transcript_entries is None:
             return jsonify({'error': 'No transcript data provided'}), 400
 
+        transcript_entries = maybe_resegment(transcript_entries)
+        full_text = ' '.join(entry['text'] for entry in transcript_entries)
+
+        # Local extractive summary, shown while the Gemini summary is pending
+        return jsonify({
+            'summary': extractive_summary(full_text, num_sentences=num_sentences),
+            'source': 'extractive'
+        })
+
+    except Exception as e:
+        logger.error(f"Error in summary_preview: {e}")
+        return jsonify({'error': 'Failed to summarize transcript'}), 500
+
+@app.route('/identify-speakers', methods=['POST'])
+def identify_speakers():
+    try:
         try:
-            transcript_segments = json.loads(transcript_data)
-        except json.JSONDecodeError:
+            transcript_segments = read_transcript_data()
+        except TranscriptFormatError:
             return jsonify({'error': 'Invalid transcript data format'}), 400
+        except TranscriptLimitError as e:
+            return jsonify({'error': str(e)}), 413
+
+        if transcript_segments is None:
+            return jsonify({'error': 'No transcript data provided'}), 400
 
         try:
             # Use AI service to identify speakers
-            identified_segments = ai_service.identify_speakers(transcript_segments)
+            identified_segments = ai_service.identify_speakers(
+                transcript_segments,
+                **resegment_arguments()
+            )
             return jsonify({'segments': identified_segments})
         except Exception as e:
             logger.error(f"Error in speaker identification: {e}")
@@ -492,75 +684,207 @@ def identify_speakers():
         logger.error(f"Error in identify_speakers route: {e}")
         return jsonify({'error': 'Failed to process request'}), 500
 
+@app.route('/analyze-combined', methods=['POST'])
+def analyze_combined():
+    try:
+        # Comma-separated subset of 'summary', 'key_points' and 'speakers'
+        analysis_types = [
+            t.strip() for t in request.form.get('types', 'summary,key_points,speakers').split(',')
+            if t.strip()
+        ]
+
+        if not analysis_types or any(t not in ANALYSIS_TYPES for t in analysis_types):
+            return jsonify({'error': 'Invalid analysis type'}), 400
+
+        try:
+            transcript_segments = read_transcript_data()
+        except TranscriptFormatError:
+            return jsonify({'error': 'Invalid transcript data format'}), 400
+        except TranscriptLimitError as e:
+            return jsonify({'error': str(e)}), 413
+
+        if transcript_segments is None:
+            return jsonify({'error': 'No transcript data provided'}), 400
+
+        try:
+            # One model call; the response carries the same 'summary',
+            # 'key_points' and 'segments' keys as the individual routes
+            results = ai_service.analyze_transcript(
+                transcript_segments,
+                analysis_types,
+                **resegment_arguments()
+            )
+            return jsonify(results)
+        except Exception as e:
+            logger.error(f"Error in combined AI analysis: {e}")
+            return jsonify({'error': 'Failed to analyze transcript'}), 500
+
+    except Exception as e:
+        logger.error(f"Error in analyze_combined: {e}")
+        return jsonify({'error': 'Failed to process request'}), 500
+
 @app.route('/export-transcript', methods=['POST'])
 def export_transcript():
     try:
-        transcript_data = request.form.get('transcript_data', '')
         format_type = request.form.get('format', 'txt')  # Default to txt if not specified
         video_id = request.form.get('video_id', '')
         title = request.form.get('title', 'Transcript')
 
-        if not transcript_data:
-            logger.warning("No transcript provided for export")
-            return jsonify({'error': 'No transcript to export'}), 400
-
         try:
-            # Parse the transcript data from JSON string
-            transcript_entries = json.loads(transcript_data)
-        except json.JSONDecodeError:
+            # Parse the transcript data from the JSON upload
+            transcript_entries = read_transcript_data()
+        except TranscriptFormatError:
             transcript_entries = None
+        except TranscriptLimitError as e:
+            return jsonify({'error': str(e)}), 413
 
-        if transcript_entries and isinstance(transcript_entries, list):
-            # Generate formatted content based on the requested format
-            if format_type == 'srt':
-                content = generate_srt(transcript_entries)
-                filename = f'transcript_{video_id}.srt'
-                mimetype = 'text/plain'
-            elif format_type == 'vtt':
-                content = generate_vtt(transcript_entries)
-                filename = f'transcript_{video_id}.vtt'
-                mimetype = 'text/plain'
-            elif format_type == 'txt':
-                content = generate_txt(transcript_entries)
-                filename = f'transcript_{video_id}.txt'
-                mimetype = 'text/plain'
-            elif format_type == 'html':
-                content = generate_html(transcript_entries, title)
-                filename = f'transcript_{video_id}.html'
-                mimetype = 'text/html'
-            elif format_type == 'pdf':
-                pdf_bytes = generate_pdf(transcript_entries, title)
-                return send_file(
-                    io.BytesIO(pdf_bytes),
-                    mimetype='application/pdf',
-                    as_attachment=True,
-                    download_name=f'transcript_{video_id}.pdf'
-                )
-            elif format_type == 'docx':
-                docx_bytes = generate_docx(transcript_entries, title)
-                return send_file(
-                    io.BytesIO(docx_bytes),
-                    mimetype='application/vnd.openxmlformats-officedocument.wordprocessingml.document',
-                    as_attachment=True,
-                    download_name=f'transcript_{video_id}.docx'
-                )
-            else:
+        if transcript_entries:
+            transcript_entries = maybe_resegment(transcript_entries)
+
+            if format_type not in EXPORT_MIMETYPES:
                 return jsonify({'error': 'Unsupported format'}), 400
+
+            # Generate formatted content based on the requested format
+            content = render_export(transcript_entries, format_type, title)
+            filename = f'transcript_{video_id}.{format_type}'
+            mimetype = EXPORT_MIMETYPES[format_type]
         else:
-            content = transcript_data
+            content = read_transcript_text()
             filename = f'transcript_{video_id}.txt'
             mimetype = 'text/plain'
 
+            if not content:
+                logger.warning("No transcript provided for export")
+                return jsonify({'error': 'No transcript to export'}), 400
+
         # Send the file
-        response = make_response(content)
-        response.headers['Content-Type'] = mimetype
-        response.headers['Content-Disposition'] = f'attachment; filename={filename}'
-        return response
+        return export_response(content, filename, mimetype)
 
     except Exception as e:
         logger.error(f"Error exporting transcript: {str(e)}")
         return jsonify({'error': 'Failed to export transcript'}), 500
 
+EXPORT_MIMETYPES = {
+    'srt': 'text/plain',
+    'vtt': 'text/plain',
+    'txt': 'text/plain',
+    'html': 'text/html',
+    'pdf': 'application/pdf',
+    'docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+}
+
+def render_export(transcript_entries, format_type, title):
+    """Render transcript entries in one of EXPORT_MIMETYPES, as bytes."""
+    if format_type == 'srt':
+        return generate_srt(transcript_entries).encode('utf-8')
+    elif format_type == 'vtt':
+        return generate_vtt(transcript_entries).encode('utf-8')
+    elif format_type == 'txt':
+        return generate_txt(transcript_entries).encode('utf-8')
+    elif format_type == 'html':
+        return generate_html(transcript_entries, title).encode('utf-8')
+    elif format_type == 'pdf':
+        return generate_pdf(transcript_entries, title)
+    elif format_type == 'docx':
+        return generate_docx(transcript_entries, title)
+    raise ValueError(f"Unsupported format: {format_type}")
+
+def export_response(content, filename, mimetype):
+    """Build a file download response for exported transcript content."""
+    response = make_response(content)
+    response.headers['Content-Type'] = mimetype
+    response.headers['Content-Disposition'] = f'attachment; filename={filename}'
+    return response
+
+# Formats the bundle export renders in worker processes; the text formats
+# are cheap enough to render inline
+PROCESS_EXPORT_FORMATS = ('pdf', 'docx')
+BUNDLE_WORKERS = int(os.environ.get('BUNDLE_WORKERS', 2))
+
+_export_pool = None
+
+def get_export_pool():
+    """Lazily create the process pool used for PDF and DOCX rendering."""
+    global _export_pool
+    if _export_pool is None:
+        _export_pool = ProcessPoolExecutor(max_workers=BUNDLE_WORKERS)
+    return _export_pool
+
+class ZipStreamBuffer(io.RawIOBase):
+    """Unseekable sink for zipfile that hands back written bytes in chunks."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+def render_bundle_entry(transcript_entries, format_type, title):
+    """Render one bundle entry inline, or return None if rendering fails."""
+    try:
+        return render_export(transcript_entries, format_type, title)
+    except Exception as e:
+        # The response is already streaming, so the entry is left out
+        logger.error(f"Error rendering {format_type} for bundle, skipping it: {e}")
+        return None
+
+def render_bundle(transcript_entries, formats, title, video_id):
+    """Yield a ZIP archive of the transcript in several formats.
+
+    PDF and DOCX are rendered in worker processes while the text formats
+    are rendered inline. Each entry is yielded as soon as it is written, so
+    only one entry at a time is held in memory, never the whole archive.
+    """
+    global _export_pool
+    futures = {}
+    try:
+        pool = get_export_pool()
+        for format_type in formats:
+            if format_type in PROCESS_EXPORT_FORMATS:
+                futures[pool.submit(render_export, transcript_entries, format_type, title)] = format_type
+    except (OSError, BrokenProcessPool) as e:
+        logger.warning(f"Export worker pool unavailable, rendering inline: {e}")
+    pending = [format_type for format_type in formats if format_type not in futures.values()]
+
+    sink = ZipStreamBuffer()
+    try:
+        with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+            for format_type in pending:
+                content = render_bundle_entry(transcript_entries, format_type, title)
+                if content is not None:
+                    archive.writestr(f'transcript_{video_id}.{format_type}', content)
+                    yield sink.drain()
+
+            for future in as_completed(futures):
+                format_type = futures[future]
+                try:
+                    content = future.result()
+                except BrokenProcessPool:
+                    _export_pool = None
+                    logger.warning(f"Export worker died, rendering {format_type} inline")
+                    content = render_bundle_entry(transcript_entries, format_type, title)
+                except Exception as e:
+                    logger.warning(f"Export worker failed for {format_type}, rendering inline: {e}")
+                    content = render_bundle_entry(transcript_entries, format_type, title)
+                if content is not None:
+                    archive.writestr(f'transcript_{video_id}.{format_type}', content)
+                    yield sink.drain()
+
+        # Central directory
+        yield sink.drain()
+    finally:
+        for future in futures:
+            future.cancel()
+
 def generate_html(transcript_entries, title):
     """Generate HTML format from transcript entries."""
     html_content = f"""
@@ -615,7 +939,9 @@ def generate_pdf(transcript_entries, title):
 
         # Create PDF buffer
         buffer = BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=letter)
+        # invariant=1 leaves out creation timestamps and random document
+        # IDs, so the same transcript always renders the same bytes
+        doc = SimpleDocTemplate(buffer, pagesize=letter, invariant=1)
         styles = getSampleStyleSheet()
 
         # Create custom styles
@@ -675,13 +1001,66 @@ def generate_docx(transcript_entries, title):
         # Save to buffer
         buffer = BytesIO()
         doc.save(buffer)
-        buffer.seek(0)
-        return buffer.getvalue()
+        return zip_without_timestamps(buffer.getvalue())
 
     except Exception as e:
         logger.error(f"Error generating DOCX: {str(e)}")
         raise
 
+def zip_without_timestamps(data):
+    """Rewrite a ZIP archive with fixed member timestamps.
+
+    python-docx stamps every member with the save time; fixing them makes
+    the same transcript always render the same bytes (and ETag).
+    """
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(io.BytesIO(data)) as source, \
+            zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_DEFLATED) as target:
+        for info in source.infolist():
+            target.writestr(zipfile.ZipInfo(info.filename), source.read(info), zipfile.ZIP_DEFLATED)
+    return buffer.getvalue()
+
+@app.route('/export-bundle', methods=['POST'])
+def export_bundle():
+    try:
+        # Comma-separated subset of EXPORT_MIMETYPES; all formats by default
+        formats = []
+        for format_type in request.form.get('formats', ','.join(EXPORT_MIMETYPES)).split(','):
+            format_type = format_type.strip()
+            if format_type and format_type not in formats:
+                formats.append(format_type)
+        video_id = request.form.get('video_id', '')
+        title = request.form.get('title', 'Transcript')
+
+        if not formats or any(format_type not in EXPORT_MIMETYPES for format_type in formats):
+            return jsonify({'error': 'Unsupported format'}), 400
+
+        # Parsed once and shared by every format in the bundle
+        try:
+            transcript_entries = read_transcript_data()
+        except TranscriptFormatError:
+            return jsonify({'error': 'Invalid transcript data format'}), 400
+        except TranscriptLimitError as e:
+            return jsonify({'error': str(e)}), 413
+
+        if not transcript_entries:
+            logger.warning("No transcript provided for bundle export")
+            return jsonify({'error': 'No transcript to export'}), 400
+
+        transcript_entries = maybe_resegment(transcript_entries)
+
+        logger.info(f"Streaming transcript bundle with formats: {', '.join(formats)}")
+        response = app.response_class(
+            render_bundle(transcript_entries, formats, title, video_id),
+            mimetype='application/zip'
+        )
+        response.headers['Content-Disposition'] = f'attachment; filename=transcript_{video_id}.zip'
+        return response
+
+    except Exception as e:
+        logger.error(f"Error exporting transcript bundle: {str(e)}")
+        return jsonify({'error': 'Failed to export transcript bundle'}), 500
+
 @app.route('/generate-share-link', methods=['POST'])
 def generate_share_link():
     try:
@@ -691,16 +1070,212 @@ def generate_share_link():
         if not video_id:
             return jsonify({'error': 'No video ID provided'}), 400
 
-        # Generate a shareable YouTube link
-        share_link = f'https://youtu.be/{video_id}'
-        if timestamp:
-            share_link += f'?t={int(float(timestamp))}'
-
-        return jsonify({'share_link': share_link})
+        return jsonify({'share_link': build_share_link(video_id, timestamp)})
 
     except Exception as e:
         logger.error(f"Error generating share link: {str(e)}")
         return jsonify({'error': 'Failed to generate share link'}), 500
 
+def build_share_link(video_id, timestamp=None):
+    """Generate a shareable YouTube link, optionally starting at a timestamp."""
+    share_link = f'https://youtu.be/{video_id}'
+    if timestamp:
+        share_link += f'?t={int(float(timestamp))}'
+    return share_link
+
+@app.route('/chapters', methods=['POST'])
+def get_chapters():
+    try:
+        video_id = request.form.get('video_id', '')
+
+        try:
+            transcript_entries = read_transcript_data()
+        except TranscriptFormatError:
+            return jsonify({'error': 'Invalid transcript data format'}), 400
+        except TranscriptLimitError as e:
+            return jsonify({'error': str(e)}), 413
+
+        if transcript_entries is None:
+            return jsonify({'error': 'No transcript data provided'}), 400
+
+        # Runs locally on TF-IDF vectors; no model call involved
+        chapter_list = detect_chapters(
+            transcript_entries,
+            stop_words=set(stopwords.words('english'))
+        )
+
+        if video_id:
+            for chapter in chapter_list:
+                chapter['share_link'] = build_share_link(video_id, chapter['start'])
+
+        logger.info(f"Detected {len(chapter_list)} chapters")
+        return jsonify({'chapters': chapter_list})
+
+    except Exception as e:
+        logger.error(f"Error detecting chapters: {str(e)}")
+        return jsonify({'error': 'Failed to detect chapters'}), 500
+
+# Cacheable GET variants. Responses depend only on the URL (never on the
+# session), carry strong content ETags and may be stored by browsers,
+# proxies and CDNs.
+
+VIDEO_ID_RE = re.compile(r'^[A-Za-z0-9_-]{11}$')
+
+etag_store = EtagStore()
+
+def cacheable_get(cache_key, render):
+    """Serve a GET response with a strong content ETag and Cache-Control.
+
+    ETags already served for cache_key are remembered, so a matching
+    If-None-Match is answered with 304 before render() fetches or renders
+    anything.
+    """
+    known_etag = etag_store.get(cache_key)
+    if known_etag and request.if_none_match.contains_weak(known_etag):
+        logger.debug(f"ETag hit for {cache_key}")
+        response = app.response_class(status=304)
+        response.set_etag(known_etag)
+    else:
+        response = render()
+        if response.status_code != 200:
+            return response
+        etag = content_etag(response.get_data())
+        etag_store.set(cache_key, etag)
+        response.set_etag(etag)
+
+    response.cache_control.public = True
+    response.cache_control.max_age = etag_store.max_age
+    return response.make_conditional(request)
+
+def video_id_arg():
+    """Read and validate the video_id query parameter."""
+    video_id = request.args.get('video_id', '')
+    return video_id if VIDEO_ID_RE.match(video_id) else None
+
+@app.route('/get-languages', methods=['GET'])
+def get_languages_cached():
+    try:
+        video_id = video_id_arg()
+        if not video_id:
+            return jsonify({'error': 'Invalid YouTube video ID'}), 400
+
+        def render():
+            transcript_list = youtube_transcript_api.YouTubeTranscriptApi.list_transcripts(video_id)
+            original_language = find_original_language(transcript_list)
+            languages = list_languages(transcript_list)
+            if not languages:
+                return make_response(jsonify({'error': 'No transcripts available for this video'}), 404)
+            return jsonify({
+                'languages': languages,
+                'original_language': original_language,
+                'video_id': video_id
+            })
+
+        return cacheable_get(('languages', video_id), render)
+
+    except TranscriptsDisabled:
+        return jsonify({'error': 'Transcripts are disabled for this video'}), 400
+    except NoTranscriptFound:
+        return jsonify({'error': 'No transcript found for this video'}), 400
+    except Exception as e:
+        logger.error(f"Error getting languages: {str(e)}")
+        return jsonify({'error': 'An error occurred while fetching available languages'}), 500
+
+@app.route('/get-transcript', methods=['GET'])
+def get_transcript_cached():
+    try:
+        video_id = video_id_arg()
+        language_code = request.args.get('language', 'en')
+        # Original language to translate from; the POST route reads it from
+        # the session, which would make the response uncacheable
+        original_language = request.args.get('original') or None
+        if not video_id:
+            return jsonify({'error': 'Invalid YouTube video ID'}), 400
+
+        def render():
+            transcript, transcript_data = fetch_transcript(video_id, language_code, original_language)
+            if not transcript_data:
+                return make_response(jsonify({'error': 'No transcript available for this video'}), 404)
+            return jsonify({
+                'transcript_data': transcript_data,
+                'video_id': video_id,
+                'language': transcript.language,
+                'language_code': transcript.language_code,
+                'is_translation': language_code != transcript.language_code
+            })
+
+        return cacheable_get(('transcript', video_id, language_code, original_language), render)
+
+    except TranscriptsDisabled:
+        return jsonify({'error': 'Transcripts are disabled for this video'}), 400
+    except NoTranscriptFound:
+        return jsonify({'error': 'No transcript found for this video'}), 400
+    except Exception as e:
+        logger.error(f"Error getting transcript: {str(e)}")
+        return jsonify({'error': 'An error occurred while fetching the transcript'}), 500
+
+@app.route('/export-transcript', methods=['GET'])
+def export_transcript_cached():
+    try:
+        video_id = video_id_arg()
+        language_code = request.args.get('language', 'en')
+        original_language = request.args.get('original') or None
+        format_type = request.args.get('format', 'txt')
+        title = request.args.get('title', 'Transcript')
+        if not video_id:
+            return jsonify({'error': 'Invalid YouTube video ID'}), 400
+        if format_type not in EXPORT_MIMETYPES:
+            return jsonify({'error': 'Unsupported format'}), 400
+
+        def render():
+            transcript, transcript_data = fetch_transcript(video_id, language_code, original_language)
+            if not transcript_data:
+                return make_response(jsonify({'error': 'No transcript available for this video'}), 404)
+            return export_response(
+                render_export(transcript_data, format_type, title),
+                f'transcript_{video_id}.{format_type}',
+                EXPORT_MIMETYPES[format_type]
+            )
+
+        return cacheable_get(('export', video_id, language_code, original_language, format_type, title), render)
+
+    except TranscriptsDisabled:
+        return jsonify({'error': 'Transcripts are disabled for this video'}), 400
+    except NoTranscriptFound:
+        return jsonify({'error': 'No transcript found for this video'}), 400
+    except Exception as e:
+        logger.error(f"Error exporting transcript: {str(e)}")
+        return jsonify({'error': 'Failed to export transcript'}), 500
+
+@app.route('/generate-wordcloud', methods=['GET'])
+def generate_wordcloud_cached():
+    # Unlike the POST route, word positions are not stored in the session,
+    # so clicking words in this image is not supported
+    try:
+        video_id = video_id_arg()
+        language_code = request.args.get('language', 'en')
+        if not video_id:
+            return jsonify({'error': 'Invalid YouTube video ID'}), 400
+
+        def render():
+            transcript, transcript_data = fetch_transcript(video_id, language_code)
+            try:
+                png_bytes, word_positions = render_wordcloud(transcript_data)
+            except ValueError as e:
+                return make_response(jsonify({'error': str(e)}), 400)
+            response = make_response(png_bytes)
+            response.headers['Content-Type'] = 'image/png'
+            return response
+
+        return cacheable_get(('wordcloud', video_id, language_code), render)
+
+    except TranscriptsDisabled:
+        return jsonify({'error': 'Transcripts are disabled for this video'}), 400
+    except NoTranscriptFound:
+        return jsonify({'error': 'No transcript found for this video'}), 400
+    except Exception as e:
+        logger.error(f"Error generating word cloud: {str(e)}")
+        return jsonify({'error': 'Failed to generate word cloud'}), 500
+
 if __name__ == '__main__':
     app.run(debug=True)
\ No newline at end of file
@@ -0,0 +1,170 @@
+import re
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Segments are pooled into fixed-length time blocks before vectorizing, so the
+# matrix size depends on video length rather than on caption granularity.
+DEFAULT_BLOCK_SECONDS = 20.0
+# Number of blocks compared on each side of a candidate boundary
+DEFAULT_WINDOW_BLOCKS = 6
+DEFAULT_MIN_CHAPTER_SECONDS = 120.0
+DEFAULT_MAX_CHAPTERS = 20
+DEFAULT_TOP_KEYWORDS = 3
+# Valleys shallower than this are noise within a single topic
+DEFAULT_MIN_DEPTH = 0.2
+# The (blocks x terms) matrices are dense, so the vocabulary is capped to the
+# terms found in the most blocks
+DEFAULT_MAX_TERMS = 5000
+
+WORD_RE = re.compile(r"[^\W\d_]{3,}")
+
+
+def _tokenize(text, stop_words):
+    return [word for word in WORD_RE.findall(text.lower()) if word not in stop_words]
+
+
+def _term_matrix(transcript_entries, block_seconds, stop_words, max_terms):
+    """Build a (blocks x terms) count matrix and the start time of each block.
+
+    Terms found in a single block add nothing to any similarity across a
+    gap and are dropped, then at most max_terms terms are kept, ranked by
+    the number of blocks they appear in.
+    """
+    vocabulary = {}
+    rows, cols = [], []
+    block_of_entry = []
+
+    for entry in transcript_entries:
+        block = int(float(entry['start']) // block_seconds)
+        block_of_entry.append(block)
+        for word in _tokenize(entry.get('text', ''), stop_words):
+            rows.append(block)
+            cols.append(vocabulary.setdefault(word, len(vocabulary)))
+
+    # Drop empty stretches of time so gaps in the captions don't count as blocks
+    used_blocks = np.unique(np.asarray(block_of_entry, dtype=np.int64))
+    block_index = np.searchsorted(used_blocks, np.asarray(rows, dtype=np.int64))
+    cols = np.asarray(cols, dtype=np.int64)
+
+    num_terms = len(vocabulary)
+    block_terms = np.unique(block_index * num_terms + cols)
+    document_frequency = np.bincount(block_terms % num_terms, minlength=num_terms)
+    kept = np.flatnonzero(document_frequency >= 2)
+    if len(kept) == 0:
+        # No term is shared between blocks; keep them all for the keywords
+        kept = np.flatnonzero(document_frequency)
+    if len(kept) > max_terms:
+        kept = np.sort(kept[np.argsort(-document_frequency[kept], kind='stable')[:max_terms]])
+    column = np.full(num_terms, -1, dtype=np.int64)
+    column[kept] = np.arange(len(kept))
+    cols = column[cols]
+    in_vocabulary = cols >= 0
+
+    counts = np.zeros((len(used_blocks), len(kept)), dtype=np.float32)
+    np.add.at(counts, (block_index[in_vocabulary], cols[in_vocabulary]), 1.0)
+
+    # Each block starts at its earliest segment
+    block_starts = np.full(len(used_blocks), np.inf)
+    entry_block_index = np.searchsorted(used_blocks, np.asarray(block_of_entry, dtype=np.int64))
+    starts = np.asarray([float(entry['start']) for entry in transcript_entries])
+    np.minimum.at(block_starts, entry_block_index, starts)
+
+    terms = np.empty(num_terms, dtype=object)
+    for word, index in vocabulary.items():
+        terms[index] = word
+    return counts, block_starts, terms[kept]
+
+
+def _tfidf(counts):
+    """Sublinear TF-IDF weighting with smoothed IDF, as used by scikit-learn."""
+    document_frequency = np.count_nonzero(counts, axis=0)
+    idf = np.log((1 + counts.shape[0]) / (1 + document_frequency)) + 1
+    return (np.log1p(counts) * idf).astype(np.float32)
+
+
+def _gap_similarities(weights, window):
+    """Cosine similarity between the window before and after every block gap."""
+    cumulative = np.vstack([np.zeros((1, weights.shape[1]), dtype=weights.dtype), np.cumsum(weights, axis=0)])
+    gaps = np.arange(1, weights.shape[0])
+    left = cumulative[gaps] - cumulative[np.maximum(gaps - window, 0)]
+    right = cumulative[np.minimum(gaps + window, weights.shape[0])] - cumulative[gaps]
+
+    norms = np.linalg.norm(left, axis=1) * np.linalg.norm(right, axis=1)
+    dots = np.einsum('ij,ij->i', left, right)
+    return np.divide(dots, norms, out=np.ones_like(dots), where=norms > 0)
+
+
+def _depth_scores(similarities, window):
+    """TextTiling depth: how far each gap dips below the peaks around it."""
+    padded = np.pad(similarities, window, mode='edge')
+    windows = sliding_window_view(padded, 2 * window + 1)
+    left_peak = windows[:, :window + 1].max(axis=1)
+    right_peak = windows[:, window:].max(axis=1)
+    return (left_peak - similarities) + (right_peak - similarities)
+
+
+def detect_chapters(transcript_entries, stop_words=frozenset(),
+                    block_seconds=DEFAULT_BLOCK_SECONDS,
+                    window_blocks=DEFAULT_WINDOW_BLOCKS,
+                    min_chapter_seconds=DEFAULT_MIN_CHAPTER_SECONDS,
+                    max_chapters=DEFAULT_MAX_CHAPTERS,
+                    top_keywords=DEFAULT_TOP_KEYWORDS,
+                    min_depth=DEFAULT_MIN_DEPTH,
+                    max_terms=DEFAULT_MAX_TERMS):
+    """Split a transcript into chapters at topic change-points.
+
+    Segments are pooled into time blocks and TF-IDF weighted. Each gap
+    between blocks is scored by the cosine similarity of the windows on
+    either side; the deepest similarity valleys, at least
+    min_chapter_seconds apart, become chapter boundaries. Returns a list of
+    {'start', 'title', 'keywords'} dicts, the first starting with the
+    transcript.
+    """
+    if not transcript_entries:
+        return []
+
+    counts, block_starts, terms = _term_matrix(transcript_entries, block_seconds, stop_words, max_terms)
+    if counts.shape[1] == 0:
+        return []
+    weights = _tfidf(counts)
+
+    boundaries = [0]
+    if weights.shape[0] > 1:
+        similarities = _gap_similarities(weights, window_blocks)
+        depths = _depth_scores(similarities, window_blocks)
+        # Only the bottom of each valley is a candidate, and only valleys
+        # deeper than mean + std / 2 of all valleys; TextTiling's
+        # mean - std / 2 cutoff admits nearly every valley at this window size
+        padded = np.pad(depths, 1, mode='constant', constant_values=-np.inf)
+        valleys = np.flatnonzero((depths >= padded[:-2]) & (depths > padded[2:]))
+        if len(valleys) == 0:
+            valleys = np.arange(len(depths))
+        cutoff = depths[valleys].mean() + depths[valleys].std() / 2
+        candidates = valleys[depths[valleys] >= max(cutoff, min_depth)]
+        candidates = candidates[np.argsort(-depths[candidates], kind='stable')]
+
+        # Greedily keep the deepest boundaries that leave long enough chapters
+        chosen_starts = [block_starts[0]]
+        for gap in candidates:
+            if len(boundaries) >= max_chapters:
+                break
+            block = gap + 1
+            start = block_starts[block]
+            if all(abs(start - other) >= min_chapter_seconds for other in chosen_starts) and \
+                    block_starts[-1] - start >= min_chapter_seconds:
+                boundaries.append(block)
+                chosen_starts.append(start)
+        boundaries.sort()
+
+    chapter_weights = np.add.reduceat(weights, boundaries, axis=0)
+    top_terms = np.argsort(-chapter_weights, axis=1, kind='stable')[:, :top_keywords]
+
+    chapters = []
+    for row, block in enumerate(boundaries):
+        keywords = [terms[i] for i in top_terms[row] if chapter_weights[row, i] > 0]
+        chapters.append({
+            'start': float(block_starts[block]),
+            'title': ', '.join(word.capitalize() for word in keywords),
+            'keywords': keywords
+        })
+    return chapters
@@ -0,0 +1,47 @@
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+
+# Seconds browsers, proxies and the ETag store may reuse a GET response
+DEFAULT_MAX_AGE = 3600
+DEFAULT_MAX_ENTRIES = 4096
+
+
+def content_etag(data):
+    """Strong ETag value (unquoted) derived from the response body."""
+    return hashlib.sha256(data).hexdigest()[:32]
+
+
+class EtagStore:
+    """Bounded, expiring map of cache key -> ETag last served for it.
+
+    Lets a worker answer If-None-Match with 304 without fetching or
+    rendering the resource again. Entries expire after max_age seconds so
+    upstream transcript changes are picked up.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, max_age=DEFAULT_MAX_AGE):
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            etag, stored_at = entry
+            if time.monotonic() - stored_at > self.max_age:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return etag
+
+    def set(self, key, etag):
+        with self._lock:
+            self._entries[key] = (etag, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
@@ -0,0 +1,159 @@
+import re
+import math
+
+# Default limits for a merged cue. 84 characters is two standard 42-character
+# subtitle lines.
+DEFAULT_MAX_DURATION = 7.0
+DEFAULT_MAX_CHARS = 84
+
+# How many trailing words are compared against the head of the next fragment
+# when removing rolling duplicates. Keeping this bounded keeps the pass linear.
+MAX_OVERLAP_WORDS = 16
+# Shorter overlaps are only dropped when they cover the whole fragment, so a
+# word genuinely said twice ("no, no") survives.
+MIN_OVERLAP_WORDS = 2
+
+SENTENCE_END_RE = re.compile(r'[.!?…]["\')\]]*$')
+WORD_NORMALIZE_RE = re.compile(r'[^\w]+')
+
+
+def _normalize_word(word):
+    """Lowercase a word and strip punctuation for overlap comparison."""
+    return WORD_NORMALIZE_RE.sub('', word.lower())
+
+
+def _overlap_length(tail, words):
+    """Return the length of the longest suffix of tail that prefixes words."""
+    limit = min(len(tail), len(words))
+    for k in range(limit, 0, -1):
+        if tail[-k:] == words[:k]:
+            return k if k >= MIN_OVERLAP_WORDS or k == len(words) else 0
+    return 0
+
+
+def _entry_speaker(entry):
+    """Return the (key, value) an entry stores its speaker under."""
+    for key in ('speaker_id', 'speaker'):
+        if entry.get(key) is not None:
+            return key, entry[key]
+    return None, None
+
+
+def resegment_transcript(transcript_entries, max_duration=DEFAULT_MAX_DURATION,
+                         max_chars=DEFAULT_MAX_CHARS):
+    """Merge caption fragments into sentence-level cues in a single pass.
+
+    Fragments are appended to the current cue until it ends a sentence,
+    would exceed max_duration seconds or max_chars characters, or the
+    speaker changes. Words repeated from the end of the previous fragment
+    (rolling auto-caption text) are dropped. Each cue keeps the 'start',
+    'duration' and 'text' keys of the input plus a 'source_range' of the
+    [first, last) input indices it was built from, and the speaker under
+    the same 'speaker_id' or 'speaker' key as its first fragment.
+    """
+    cues = []
+    tail = []  # normalized trailing words already emitted, for de-duplication
+    tail_speaker = None
+
+    cue_words = []
+    cue_chars = 0
+    cue_start = cue_end = 0.0
+    cue_first = 0
+    cue_speaker = cue_speaker_key = None
+
+    def flush(last_index):
+        if not cue_words:
+            return
+        if cues:
+            # Overlapping fragments can leave the previous cue running past
+            # the start of this one.
+            previous = cues[-1]
+            previous['duration'] = max(0.0, min(previous['duration'], cue_start - previous['start']))
+        cue = {
+            'text': ' '.join(cue_words),
+            'start': cue_start,
+            'duration': max(0.0, cue_end - cue_start),
+            'source_range': [cue_first, last_index]
+        }
+        if cue_speaker is not None:
+            cue[cue_speaker_key] = cue_speaker
+        cues.append(cue)
+
+    for i, entry in enumerate(transcript_entries):
+        words = entry.get('text', '').split()
+        start = float(entry.get('start', 0))
+        end = start + float(entry.get('duration', 0))
+        speaker_key, speaker = _entry_speaker(entry)
+
+        if speaker == tail_speaker:
+            normalized = [_normalize_word(word) for word in words[:MAX_OVERLAP_WORDS]]
+            words = words[_overlap_length(tail, normalized):]
+        else:
+            tail = []
+        tail_speaker = speaker
+
+        if not words:
+            # Pure repeat of text already emitted; only extend the timing,
+            # of the previous cue if it was already flushed.
+            if cue_words:
+                cue_end = max(cue_end, end)
+            elif cues:
+                previous = cues[-1]
+                previous['duration'] = max(previous['duration'], end - previous['start'])
+                previous['source_range'][1] = i + 1
+            continue
+
+        text_chars = sum(len(word) for word in words) + len(words) - 1
+        if cue_words and (
+            speaker != cue_speaker
+            or end - cue_start > max_duration
+            or cue_chars + 1 + text_chars > max_chars
+        ):
+            flush(i)
+            cue_words = []
+
+        if not cue_words:
+            cue_start, cue_end = start, end
+            # Leading fragments without text belong to the first cue
+            cue_first = cues[-1]['source_range'][1] if cues else 0
+            cue_chars = text_chars
+            cue_speaker, cue_speaker_key = speaker, speaker_key
+        else:
+            cue_end = max(cue_end, end)
+            cue_chars += 1 + text_chars
+        cue_words.extend(words)
+
+        tail = (tail + [_normalize_word(word) for word in words[-MAX_OVERLAP_WORDS:]])[-MAX_OVERLAP_WORDS:]
+
+        if SENTENCE_END_RE.search(words[-1]):
+            flush(i + 1)
+            cue_words = []
+
+    flush(len(transcript_entries))
+    return cues
+
+
+def estimate_tokens(text):
+    """Rough token estimate (about four characters per token for English)."""
+    return math.ceil(len(text) / 4)
+
+
+def segmentation_stats(original_entries, resegmented_entries):
+    """Compare segment, character and estimated token counts before and after
+    re-segmentation, using the '[start]: text' line format sent to the model."""
+    def measure(entries):
+        payload = '\n'.join(f"[{entry['start']:.2f}s]: {entry['text']}" for entry in entries)
+        return len(entries), len(payload), estimate_tokens(payload)
+
+    segments_before, chars_before, tokens_before = measure(original_entries)
+    segments_after, chars_after, tokens_after = measure(resegmented_entries)
+    reduction = 1 - tokens_after / tokens_before if tokens_before else 0.0
+    return {
+        'segments_before': segments_before,
+        'segments_after': segments_after,
+        'chars_before': chars_before,
+        'chars_after': chars_after,
+        'tokens_before': tokens_before,
+        'tokens_after': tokens_after,
+        'token_reduction': round(reduction, 3)
+    }
@@ -18,6 +18,27 @@ document.addEventListener('DOMContentLoaded', function() {
     let currentMatchIndex = -1;
     let matches = [];
     let currentTranscriptData = null;
+    // Summary and key points fetched together for the current transcript
+    let currentAnalysis = null;
+    // Language of the shown transcript and the video's original language,
+    // for the cacheable GET transcript and export URLs
+    let currentLanguageCode = null;
+    let originalLanguageCode = null;
+
+    function transcriptQuery(params) {
+        return new URLSearchParams({
+            video_id: extractVideoId(currentVideoUrl) || '',
+            language: currentLanguageCode,
+            ...(originalLanguageCode ? { original: originalLanguageCode } : {}),
+            ...params
+        }).toString();
+    }
+
+    // Send the transcript as a file part so the server can stream-parse it
+    // instead of holding it in memory as a form field
+    function transcriptUpload() {
+        return new Blob([JSON.stringify(currentTranscriptData)], { type: 'application/json' });
+    }
 
     function showLoading() {
         loading.classList.remove('d-none');
@@ -219,15 +240,12 @@ document.addEventListener('DOMContentLoaded', function() {
     async function fetchTranscript(url, languageCode = 'en') {
         showLoading();
 
-        const formData = new FormData();
-        formData.append('url', url);
-        formData.append('language', languageCode);
-
         try {
-            const response = await fetch('/get-transcript', {
-                method: 'POST',
-                body: formData
-            });
+            // GET so the browser and any CDN can revalidate with the ETag
+            const response = await fetch(`/get-transcript?${transcriptQuery({
+                video_id: extractVideoId(url) || '',
+                language: languageCode
+            })}`);
 
             const data = await response.json();
 
@@ -235,6 +253,8 @@ document.addEventListener('DOMContentLoaded', function() {
                 throw new Error(data.error || 'Failed to fetch transcript');
             }
 
+            currentAnalysis = null;
+            currentLanguageCode = languageCode;
             showTranscript(data.transcript_data, data.language);
         } catch (err) {
             showError(err.message);
@@ -270,6 +290,7 @@ document.addEventListener('DOMContentLoaded', function() {
             languageSelector.classList.remove('d-none');
 
             // Update original language display
+            originalLanguageCode = data.original_language ? data.original_language.code : null;
             if (data.original_language) {
                 document.getElementById('originalLanguage').textContent = data.original_language.name;
                 // Detect and show the language
@@ -336,17 +357,30 @@ document.addEventListener('DOMContentLoaded', function() {
 
             if (format) {
                 // Handle file export
-                const formData = new FormData();
-                formData.append('transcript_data', JSON.stringify(currentTranscriptData));
-                formData.append('format', format);
-                formData.append('video_id', extractVideoId(currentVideoUrl));
-                formData.append('title', 'YouTube Transcript');
-
                 try {
-                    const response = await fetch('/export-transcript', {
-                        method: 'POST',
-                        body: formData
-                    });
+                    let response;
+                    if (format !== 'zip' && Array.isArray(currentTranscriptData) &&
+                            !currentTranscriptData.some(entry => entry.speaker_id)) {
+                        // Unchanged since it was fetched, so the server can
+                        // export it by URL and answer repeats from cache
+                        response = await fetch(`/export-transcript?${transcriptQuery({
+                            format: format,
+                            title: 'YouTube Transcript'
+                        })}`);
+                    } else {
+                        const formData = new FormData();
+                        formData.append('transcript_data', transcriptUpload(), 'transcript.json');
+                        formData.append('format', format);
+                        formData.append('video_id', extractVideoId(currentVideoUrl));
+                        formData.append('title', 'YouTube Transcript');
+
+                        // The ZIP bundle renders every format from one upload
+                        const endpoint = format === 'zip' ? '/export-bundle' : '/export-transcript';
+                        response = await fetch(endpoint, {
+                            method: 'POST',
+                            body: formData
+                        });
+                    }
 
                     if (!response.ok) {
                         throw new Error('Failed to export transcript');
@@ -487,7 +521,7 @@ document.addEventListener('DOMContentLoaded', function() {
         wordCloudModal.show();
 
         const formData = new FormData();
-        formData.append('transcript_data', JSON.stringify(currentTranscriptData));
+        formData.append('transcript_data', transcriptUpload(), 'transcript.json');
 
         try {
             const response = await fetch('/generate-wordcloud', {
@@ -566,28 +600,64 @@ document.addEventListener('DOMContentLoaded', function() {
             aiAnalysisLoading.classList.remove('d-none');
             aiAnalysisModal.show();
 
-            const formData = new FormData();
-            formData.append('transcript_data', JSON.stringify(currentTranscriptData));
-            formData.append('type', analysisType);
-
             try {
-                const response = await fetch('/analyze-transcript', {
-                    method: 'POST',
-                    body: formData
-                });
+                // Both analyses come back from one model call, so the
+                // second button is served from the cached response
+                let data = currentAnalysis;
+                if (!data) {
+                    const formData = new FormData();
+                    formData.append('transcript_data', transcriptUpload(), 'transcript.json');
+                    formData.append('types', 'summary,key_points');
+
+                    const analysisRequest = fetch('/analyze-combined', {
+                        method: 'POST',
+                        body: formData
+                    });
 
-                if (!response.ok) {
-                    throw new Error('Failed to analyze transcript');
-                }
+                    // Show an instant local summary while the AI one is generated
+                    if (analysisType === 'summary') {
+                        const previewData = new FormData();
+                        previewData.append('transcript_data', transcriptUpload(), 'transcript.json');
+                        fetch('/summary-preview', {
+                            method: 'POST',
+                            body: previewData
+                        })
+                            .then(response => response.ok ? response.json() : null)
+                            .then(preview => {
+                                if (preview && !aiAnalysisLoading.classList.contains('d-none')) {
+                                    aiAnalysisContent.innerHTML = `
+                                        <div class="ai-analysis-content">
+                                            <h6><i class="fa fa-file-text-o me-2"></i>Summary preview</h6>
+                                            <p class="text-muted"></p>
+                                        </div>
+                                    `;
+                                    // The summary is raw transcript text
+                                    aiAnalysisContent.querySelector('p').textContent = preview.summary;
+                                }
+                            })
+                            .catch(err => console.error('Summary preview failed:', err));
+                    }
 
-                const data = await response.json();
+                    const response = await analysisRequest;
+
+                    if (!response.ok) {
+                        throw new Error('Failed to analyze transcript');
+                    }
+
+                    data = await response.json();
+                    // Don't cache service failures so the user can retry
+                    if (!String(data.summary).startsWith('Error:') &&
+                        !String(data.key_points).startsWith('Error:')) {
+                        currentAnalysis = data;
+                    }
+                }
 
                 // Format the content based on analysis type
                 let formattedContent = '<div class="ai-analysis-content">';
                 if (analysisType === 'summary') {
                     formattedContent += `
                         <h6><i class="fa fa-file-text-o me-2"></i>Summary</h6>
-                        <p>${data.summary}</p>
+                        <p></p>
                     `;
                 } else if (analysisType === 'key_points') {
                     // Assume key_points comes as a bullet-pointed string
@@ -602,6 +672,10 @@ document.addEventListener('DOMContentLoaded', function() {
                 formattedContent += '</div>';
 
                 aiAnalysisContent.innerHTML = formattedContent;
+                if (analysisType === 'summary') {
+                    // May be the extractive fallback, i.e. raw transcript text
+                    aiAnalysisContent.querySelector('p').textContent = data.summary;
+                }
             } catch (err) {
                 aiAnalysisContent.innerHTML = `
                     <div class="alert alert-danger">
@@ -650,7 +724,7 @@ document.addEventListener('DOMContentLoaded', function() {
             identifySpeakersBtn.innerHTML = '🔄 Analyzing Speakers...';
 
             const formData = new FormData();
-            formData.append('transcript_data', JSON.stringify(currentTranscriptData));
+            formData.append('transcript_data', transcriptUpload(), 'transcript.json');
 
             const response = await fetch('/identify-speakers', {
                 method: 'POST',
@@ -0,0 +1,88 @@
+import re
+import numpy as np
+
+DEFAULT_NUM_SENTENCES = 5
+DAMPING = 0.85
+MAX_ITERATIONS = 100
+TOLERANCE = 1e-6
+
+# Auto-generated captions are often unpunctuated, so long runs of words are
+# cut into pseudo-sentences of at most this many words.
+MAX_SENTENCE_WORDS = 30
+
+SENTENCE_SPLIT_RE = re.compile(r'(?<=[.!?])\s+')
+WORD_RE = re.compile(r"[^\W\d_]{3,}")
+
+
+def split_sentences(text):
+    """Split transcript text into sentences, chunking unpunctuated runs."""
+    sentences = []
+    for part in SENTENCE_SPLIT_RE.split(text):
+        words = part.split()
+        for i in range(0, len(words), MAX_SENTENCE_WORDS):
+            sentences.append(' '.join(words[i:i + MAX_SENTENCE_WORDS]))
+    return sentences
+
+
+def _sentence_vectors(sentences):
+    """L2-normalized TF-IDF sentence vectors as COO (rows, cols, values)."""
+    vocabulary = {}
+    rows, cols = [], []
+    for i, sentence in enumerate(sentences):
+        for word in set(WORD_RE.findall(sentence.lower())):
+            rows.append(i)
+            cols.append(vocabulary.setdefault(word, len(vocabulary)))
+
+    rows = np.asarray(rows, dtype=np.int64)
+    cols = np.asarray(cols, dtype=np.int64)
+    document_frequency = np.bincount(cols, minlength=len(vocabulary))
+    idf = np.log((1 + len(sentences)) / (1 + document_frequency)) + 1
+
+    values = idf[cols]
+    norms = np.sqrt(np.bincount(rows, weights=values ** 2, minlength=len(sentences)))
+    values = values / norms[rows]
+    return rows, cols, values, len(vocabulary), norms > 0
+
+
+def _textrank(rows, cols, values, num_terms, has_terms, num_sentences):
+    """PageRank over the cosine-similarity graph of the sentences.
+
+    The similarity matrix is never built: S @ v is evaluated as
+    X @ (X.T @ v) minus the diagonal, which is linear in the number of
+    non-zero TF-IDF entries instead of quadratic in the sentence count.
+    """
+    def similarity_dot(v):
+        term_totals = np.bincount(cols, weights=values * v[rows], minlength=num_terms)
+        return np.bincount(rows, weights=values * term_totals[cols], minlength=num_sentences) - v * has_terms
+
+    degree = similarity_dot(np.ones(num_sentences))
+    dangling = degree <= 1e-12
+    inverse_degree = np.divide(1.0, degree, out=np.zeros_like(degree), where=~dangling)
+
+    scores = np.full(num_sentences, 1.0 / num_sentences)
+    for _ in range(MAX_ITERATIONS):
+        # Isolated sentences spread their score evenly, as in PageRank
+        spread = scores[dangling].sum() / num_sentences
+        updated = (1 - DAMPING) / num_sentences + DAMPING * (similarity_dot(scores * inverse_degree) + spread)
+        converged = np.abs(updated - scores).sum() < TOLERANCE
+        scores = updated
+        if converged:
+            break
+    return scores
+
+
+def extractive_summary(transcript_text, num_sentences=DEFAULT_NUM_SENTENCES):
+    """Summarize a transcript locally by picking its most central sentences.
+
+    Sentences are ranked with TextRank over TF-IDF cosine similarity and
+    the top num_sentences are returned in their original order.
+    """
+    sentences = split_sentences(transcript_text)
+    if len(sentences) <= num_sentences:
+        return ' '.join(sentences)
+
+    rows, cols, values, num_terms, has_terms = _sentence_vectors(sentences)
+    scores = _textrank(rows, cols, values, num_terms, has_terms, len(sentences))
+
+    top = np.sort(np.argsort(-scores, kind='stable')[:num_sentences])
+    return ' '.join(sentences[i] for i in top)
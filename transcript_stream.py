@@ -0,0 +1,140 @@
+import json
+import codecs
+
+CHUNK_SIZE = 64 * 1024
+
+DEFAULT_MAX_SEGMENTS = 100000
+DEFAULT_MAX_TEXT_CHARS = 5000
+DEFAULT_MAX_TOTAL_CHARS = 5000000
+# Room for the non-text fields of a segment (timing, speaker info, ...)
+SEGMENT_OVERHEAD_CHARS = 8192
+# Raw JSON characters per decoded text character in the worst case: an
+# astral character escaped as a surrogate pair, e.g. "\ud83d\ude00"
+MAX_ESCAPE_CHARS = 12
+
+WHITESPACE = ' \t\n\r'
+
+_decoder = json.JSONDecoder()
+
+
+class TranscriptFormatError(ValueError):
+    """Raised when transcript data is not a JSON array of segment objects."""
+
+
+class TranscriptLimitError(ValueError):
+    """Raised when transcript data exceeds a configured size limit."""
+
+
+class _Reader:
+    """Buffered text reader over a binary or text stream."""
+
+    def __init__(self, stream, chunk_size=CHUNK_SIZE):
+        self.stream = stream
+        self.chunk_size = chunk_size
+        # utf-8-sig drops a leading byte order mark
+        self.decoder = codecs.getincrementaldecoder('utf-8-sig')()
+        self.buffer = ''
+        self.pos = 0
+        self.started = False
+
+    def fill(self):
+        """Read another chunk, dropping the consumed part of the buffer."""
+        raw = chunk = self.stream.read(self.chunk_size)
+        if isinstance(chunk, bytes):
+            try:
+                # May hold back a partial character (or BOM) until the next read
+                chunk = self.decoder.decode(chunk, final=not chunk)
+            except UnicodeDecodeError:
+                raise TranscriptFormatError("Transcript data is not valid UTF-8")
+        elif not self.started and chunk.startswith('\ufeff'):
+            chunk = chunk[1:]
+        self.started = True
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return bool(raw)
+
+    def peek(self):
+        """Return the next non-whitespace character without consuming it."""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self.fill():
+                return ''
+
+
+def iter_json_array(stream, max_element_chars):
+    """Yield the objects of a top-level JSON array, reading incrementally.
+
+    Only one element plus one read chunk is held in memory at a time.
+    max_element_chars is a loose guard against runaway elements in raw
+    JSON characters; depending on chunk boundaries it is checked only once
+    an element spans more than one read, so exact limits belong to the
+    caller.
+    """
+    reader = _Reader(stream)
+    # Each raw_decode call builds fresh key strings; share them across
+    # elements the way a single json.loads call would
+    keys = {}
+    if reader.peek() != '[':
+        raise TranscriptFormatError("Transcript data must be a JSON array")
+    reader.pos += 1
+
+    if reader.peek() == ']':
+        return
+
+    while True:
+        reader.peek()
+        while True:
+            try:
+                element, end = _decoder.raw_decode(reader.buffer, reader.pos)
+                break
+            except json.JSONDecodeError as e:
+                # Most likely the element continues in the next chunk
+                if len(reader.buffer) - reader.pos > max_element_chars:
+                    raise TranscriptLimitError("Transcript segment is too large")
+                if not reader.fill():
+                    raise TranscriptFormatError(f"Invalid transcript data: {e.msg}")
+
+        if not isinstance(element, dict):
+            raise TranscriptFormatError("Transcript segments must be JSON objects")
+        reader.pos = end
+        yield {keys.setdefault(key, key): value for key, value in element.items()}
+
+        separator = reader.peek()
+        reader.pos += 1
+        if separator == ']':
+            break
+        if separator != ',':
+            raise TranscriptFormatError("Invalid transcript data: expected ',' or ']'")
+
+    if reader.peek() != '':
+        raise TranscriptFormatError("Invalid transcript data: unexpected data after array")
+
+
+def load_transcript(stream, max_segments=DEFAULT_MAX_SEGMENTS,
+                    max_text_chars=DEFAULT_MAX_TEXT_CHARS,
+                    max_total_chars=DEFAULT_MAX_TOTAL_CHARS):
+    """Parse a JSON transcript array from a stream into a list of segments.
+
+    Limits on segment count, per-segment text length and total text length
+    are checked while parsing, so an oversized upload is rejected before
+    it is fully read.
+    """
+    segments = []
+    total_chars = 0
+    max_element_chars = max_text_chars * MAX_ESCAPE_CHARS + SEGMENT_OVERHEAD_CHARS
+    for segment in iter_json_array(stream, max_element_chars):
+        text = segment.get('text', '')
+        if not isinstance(text, str):
+            raise TranscriptFormatError("Transcript segment text must be a string")
+        if len(text) > max_text_chars:
+            raise TranscriptLimitError(f"Transcript segment text exceeds {max_text_chars} characters")
+        total_chars += len(text)
+        if total_chars > max_total_chars:
+            raise TranscriptLimitError(f"Transcript text exceeds {max_total_chars} characters")
+        if len(segments) >= max_segments:
+            raise TranscriptLimitError(f"Transcript exceeds {max_segments} segments")
+        segments.append(segment)
+    return segments